@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Shared Supabase client and collector plumbing for the media mention scripts.
+
+Both collect_media_gdelt.py and collect_media_google.py subclass
+BaseCollector and override only their search method; the outlets list is
+cached on disk and revalidated with an ETag so a restart skips the scan.
+URL deduplication happens server-side via ON CONFLICT DO NOTHING on the
+batched inserts, so no existing-URL download is needed.
+"""
+
+import diskcache
+import httpx
+import orjson
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+import os
+
+
+class SupabaseClient:
+    """Simple Supabase REST client."""
+
+    def __init__(self):
+        self.url = os.getenv("VITE_SUPABASE_URL")
+        self.key = os.getenv("VITE_SUPABASE_ANON_KEY")
+        if not self.url or not self.key:
+            raise ValueError("Supabase credentials not found in .env file")
+        self.headers = {
+            "apikey": self.key,
+            "Authorization": f"Bearer {self.key}",
+            "Content-Type": "application/json",
+            "Prefer": "return=representation"
+        }
+        # One pooled HTTP/2 client: many in-flight requests share a single
+        # multiplexed connection instead of serializing on HTTP/1.1
+        self.session = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+            headers=self.headers,
+            timeout=30
+        )
+        # Pre-parsed endpoint URLs, keyed by (table, query suffix); URL
+        # parsing is the expensive part of per-request assembly
+        self._url_cache: Dict = {}
+
+    _UPSERT_HEADERS = {"Prefer": "return=representation,resolution=ignore-duplicates"}
+
+    # PostgREST comparison operators recognized in string filter values
+    _FILTER_OPS = frozenset({"gt", "gte", "lt", "lte", "neq", "like", "ilike", "is"})
+
+    def _table_url(self, table: str, suffix: str = "") -> httpx.URL:
+        """Cached, pre-parsed URL for a table endpoint."""
+        key = (table, suffix)
+        url = self._url_cache.get(key)
+        if url is None:
+            url = httpx.URL(f"{self.url}/rest/v1/{table}{suffix}")
+            self._url_cache[key] = url
+        return url
+
+    def select(self, table: str, columns: str = "*", filters: Dict = None, limit: int = None, offset: int = None, order: str = None) -> List[Dict]:
+        """Select from a table."""
+        url = f"{self.url}/rest/v1/{table}?select={columns}"
+        if order:
+            url += f"&order={order}"
+        if limit:
+            url += f"&limit={limit}"
+        if offset:
+            url += f"&offset={offset}"
+        if filters:
+            for key, value in filters.items():
+                # A list/tuple/set filter becomes an in.(...) match so one
+                # request can cover many values; a string carrying an
+                # explicit PostgREST operator (e.g. "gt.42") passes through
+                if isinstance(value, (list, tuple, set)):
+                    url += f"&{key}=in.({','.join(str(v) for v in value)})"
+                elif isinstance(value, str) and value.split(".", 1)[0] in self._FILTER_OPS:
+                    url += f"&{key}={value}"
+                else:
+                    url += f"&{key}=eq.{value}"
+
+        response = self.session.get(url)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    def select_conditional(self, table: str, columns: str = "*", etag: str = None):
+        """Select with If-None-Match; returns (rows, etag), rows None on 304."""
+        url = f"{self.url}/rest/v1/{table}?select={columns}"
+        headers = {"If-None-Match": etag} if etag else {}
+        response = self.session.get(url, headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        response.raise_for_status()
+        return orjson.loads(response.content), response.headers.get("ETag")
+
+    def select_not_null(self, table: str, columns: str, field: str, limit: int = None, offset: int = None, order: str = None) -> List[Dict]:
+        """Select from a table where a field is not null."""
+        url = f"{self.url}/rest/v1/{table}?select={columns}&{field}=not.is.null"
+        if order:
+            url += f"&order={order}"
+        if limit:
+            url += f"&limit={limit}"
+        if offset:
+            url += f"&offset={offset}"
+
+        response = self.session.get(url)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    def insert(self, table: str, data: Dict, on_conflict: str = None) -> Optional[Dict]:
+        """Insert one row; duplicates are ignored server-side (returns None).
+
+        resolution=ignore-duplicates means the server drops conflicting rows
+        instead of raising 409, so an empty representation is the only
+        duplicate signal.
+        """
+        # orjson encodes/decodes several times faster than the stdlib;
+        # Content-Type is already application/json on the session headers
+        url = self._table_url(table, f"?on_conflict={on_conflict}" if on_conflict else "")
+        response = self.session.post(url, headers=self._UPSERT_HEADERS, content=orjson.dumps(data))
+        response.raise_for_status()
+        result = orjson.loads(response.content)
+        return result[0] if result else None
+
+    def close(self) -> None:
+        """Close the pooled HTTP client."""
+        self.session.close()
+
+    def insert_many(self, table: str, rows: List[Dict], on_conflict: str = None) -> List[Dict]:
+        """Insert many rows in a single POST, skipping duplicates server-side."""
+        if not rows:
+            return []
+        url = self._table_url(table, f"?on_conflict={on_conflict}" if on_conflict else "")
+        response = self.session.post(url, headers=self._UPSERT_HEADERS, content=orjson.dumps(rows))
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+
+class BaseCollector:
+    """Shared outlet/org/dedup plumbing for the media mention collectors."""
+
+    PAGE_SIZE = 500
+
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        self.db = SupabaseClient()
+        self.outlet_ids: Dict[str, int] = {}
+        self._outlet_domains: frozenset = frozenset()
+        # Outlets change slowly; cache them on disk and revalidate cheaply
+        self.cache = diskcache.Cache("./.cache/media")
+        self.stats = {
+            "orgs_processed": 0,
+            "mentions_found": 0,
+            "mentions_inserted": 0,
+            "duplicates_skipped": 0,
+            "errors": 0
+        }
+
+    def load_outlets(self) -> None:
+        """Load outlet IDs from database."""
+        print("Loading outlets...")
+        try:
+            # Revalidate the cached copy with If-None-Match; a 304 costs a
+            # header-sized response instead of the full table
+            cached = self.cache.get("outlets")
+            etag = cached["etag"] if cached else None
+            rows, new_etag = self.db.select_conditional("outlets", "id,url,name", etag=etag)
+            if rows is None:
+                outlets = cached["data"]
+            else:
+                outlets = rows
+                self.cache.set("outlets", {"etag": new_etag, "data": rows})
+            for outlet in outlets:
+                # Extract domain from URL
+                url = outlet["url"]
+                domain = url.replace("https://", "").replace("http://", "").replace("www.", "").rstrip("/")
+                self.outlet_ids[domain] = outlet["id"]
+                if self.verbose:
+                    print(f"  {domain} -> {outlet['id']}")
+            # Frozen domain set for the membership test in the URL-match loop
+            self._outlet_domains = frozenset(self.outlet_ids)
+            print(f"  Loaded {len(self.outlet_ids)} outlets")
+        except Exception as e:
+            print(f"  Error loading outlets: {e}")
+
+    def get_organizations(self, limit: Optional[int] = None, offset: int = 0, prioritize_ein: bool = True) -> List[Dict]:
+        """Fetch organizations from Supabase."""
+        if prioritize_ein:
+            return self.db.select_not_null("organizations", "id,name,slug,ein", "ein", limit=limit, offset=offset, order="name")
+        else:
+            return self.db.select("organizations", "id,name,slug", limit=limit, offset=offset, order="name")
+
+    def iter_organizations(self, limit: Optional[int] = None, offset: int = 0, prioritize_ein: bool = True):
+        """Yield organizations page by page instead of one big upfront query."""
+        fetched = 0
+        while True:
+            size = self.PAGE_SIZE if limit is None else min(self.PAGE_SIZE, limit - fetched)
+            if size <= 0:
+                return
+            rows = self.get_organizations(limit=size, offset=offset + fetched, prioritize_ein=prioritize_ein)
+            yield from rows
+            fetched += len(rows)
+            if len(rows) < size:
+                return
+
+    def get_outlet_id_for_url(self, url: str) -> Optional[int]:
+        """Match a URL's host against known outlet domains."""
+        host = urlsplit(url).hostname or ""
+        host = host.removeprefix("www.")
+        # Walk parent suffixes so subdomains match too
+        # (e.g. projects.freep.com -> freep.com)
+        while host:
+            if host in self._outlet_domains:
+                return self.outlet_ids[host]
+            host = host.partition(".")[2]
+        return None
+
+    def print_summary(self) -> None:
+        """Print collection summary."""
+        print("\n" + "=" * 70)
+        print("COLLECTION COMPLETE")
+        print("=" * 70)
+        print(f"Organizations processed: {self.stats['orgs_processed']}")
+        print(f"Mentions found:          {self.stats['mentions_found']}")
+        print(f"Mentions inserted:       {self.stats['mentions_inserted']}")
+        print(f"Duplicates skipped:      {self.stats['duplicates_skipped']}")
+        print(f"Errors:                  {self.stats['errors']}")
+        print("=" * 70)
@@ -16,120 +16,46 @@ Setup:
    GOOGLE_CSE_ID=your_search_engine_id
 """
 
-import json
 import time
 import argparse
 import requests
-from datetime import datetime
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
 
+from _media_common import BaseCollector
+
 load_dotenv()
 
 
-class SupabaseClient:
-    """Simple Supabase REST client."""
+def make_session() -> requests.Session:
+    """Build a requests.Session with connection pooling and retries."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
-    def __init__(self):
-        self.url = os.getenv("VITE_SUPABASE_URL")
-        self.key = os.getenv("VITE_SUPABASE_ANON_KEY")
-        if not self.url or not self.key:
-            raise ValueError("Supabase credentials not found in .env file")
-        self.headers = {
-            "apikey": self.key,
-            "Authorization": f"Bearer {self.key}",
-            "Content-Type": "application/json",
-            "Prefer": "return=representation"
-        }
 
-    def select(self, table: str, columns: str = "*", filters: Dict = None, limit: int = None, offset: int = None, order: str = None) -> List[Dict]:
-        url = f"{self.url}/rest/v1/{table}?select={columns}"
-        if order:
-            url += f"&order={order}"
-        if limit:
-            url += f"&limit={limit}"
-        if offset:
-            url += f"&offset={offset}"
-        if filters:
-            for key, value in filters.items():
-                url += f"&{key}=eq.{value}"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
-
-    def select_not_null(self, table: str, columns: str, field: str, limit: int = None, offset: int = None, order: str = None) -> List[Dict]:
-        url = f"{self.url}/rest/v1/{table}?select={columns}&{field}=not.is.null"
-        if order:
-            url += f"&order={order}"
-        if limit:
-            url += f"&limit={limit}"
-        if offset:
-            url += f"&offset={offset}"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
-
-    def insert(self, table: str, data: Dict) -> Optional[Dict]:
-        url = f"{self.url}/rest/v1/{table}"
-        response = requests.post(url, headers=self.headers, json=data)
-        if response.status_code in (200, 201):
-            result = response.json()
-            return result[0] if result else None
-        elif response.status_code == 409:
-            return None
-        else:
-            response.raise_for_status()
-            return None
-
-
-class GoogleSearchCollector:
+class GoogleSearchCollector(BaseCollector):
     """Collects media mentions using Google Custom Search API."""
 
     def __init__(self, verbose: bool = False):
-        self.verbose = verbose
+        super().__init__(verbose=verbose)
         self.api_key = os.getenv("GOOGLE_API_KEY")
         self.cse_id = os.getenv("GOOGLE_CSE_ID")
 
         if not self.api_key or not self.cse_id:
             raise ValueError("GOOGLE_API_KEY and GOOGLE_CSE_ID required in .env file")
 
-        self.db = SupabaseClient()
-        self.outlet_ids: Dict[str, int] = {}
+        self.session = make_session()
         self.queries_used = 0
-        self.stats = {
-            "orgs_processed": 0,
-            "mentions_found": 0,
-            "mentions_inserted": 0,
-            "duplicates_skipped": 0,
-            "errors": 0
-        }
-
-    def load_outlets(self) -> None:
-        """Load outlet IDs from database."""
-        print("Loading outlets...")
-        try:
-            outlets = self.db.select("outlets", "id,url,name")
-            for outlet in outlets:
-                url = outlet["url"]
-                domain = url.replace("https://", "").replace("http://", "").replace("www.", "").rstrip("/")
-                self.outlet_ids[domain] = outlet["id"]
-            print(f"  Loaded {len(self.outlet_ids)} outlets")
-        except Exception as e:
-            print(f"  Error loading outlets: {e}")
-
-    def get_organizations(self, limit: Optional[int] = None, offset: int = 0, prioritize_ein: bool = True) -> List[Dict]:
-        if prioritize_ein:
-            return self.db.select_not_null("organizations", "id,name,slug,ein", "ein", limit=limit, offset=offset, order="name")
-        else:
-            return self.db.select("organizations", "id,name,slug", limit=limit, offset=offset, order="name")
-
-    def get_all_existing_urls(self) -> set:
-        try:
-            result = self.db.select("media_mentions", "article_url")
-            return {row["article_url"] for row in result} if result else set()
-        except:
-            return set()
 
     def search_google(self, org_name: str, num_results: int = 10) -> List[Dict]:
         """Search Google Custom Search for articles mentioning an organization."""
@@ -147,7 +73,7 @@ class GoogleSearchCollector:
         }
 
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = self.session.get(url, params=params, timeout=30)
             self.queries_used += 1
 
             if response.status_code == 429:
@@ -180,35 +106,19 @@ class GoogleSearchCollector:
             self.stats["errors"] += 1
             return []
 
-    def get_outlet_id_for_url(self, url: str) -> Optional[int]:
-        """Try to match URL to a known outlet."""
-        url_lower = url.lower()
-        for domain, outlet_id in self.outlet_ids.items():
-            if domain in url_lower:
-                return outlet_id
-        return None
-
-    def save_mention_to_db(self, org_id: str, article: Dict, outlet_id: Optional[int]) -> bool:
-        """Save a mention to Supabase."""
-        try:
-            result = self.db.insert("media_mentions", {
-                "organization_id": org_id,
-                "outlet_id": outlet_id,
-                "article_url": article.get("url", ""),
-                "headline": article.get("title", "")[:500],
-                "published_date": None,  # Google doesn't always provide dates
-                "excerpt": article.get("snippet", "")[:500],
-                "mention_type": "mention"
-            })
-            return result is not None
-        except Exception as e:
-            if "duplicate" not in str(e).lower():
-                if self.verbose:
-                    print(f"      DB error: {e}")
-                self.stats["errors"] += 1
-            return False
+    def build_mention_row(self, org_id: str, article: Dict, outlet_id: Optional[int]) -> Dict:
+        """Build a media_mentions row from a search result."""
+        return {
+            "organization_id": org_id,
+            "outlet_id": outlet_id,
+            "article_url": article.get("url", ""),
+            "headline": article.get("title", "")[:500],
+            "published_date": None,  # Google doesn't always provide dates
+            "excerpt": article.get("snippet", "")[:500],
+            "mention_type": "mention"
+        }
 
-    def collect_for_org(self, org: Dict, global_urls: set) -> int:
+    def collect_for_org(self, org: Dict) -> int:
         """Collect media mentions for one organization."""
 
         print(f"  {org['name']}", end=" ", flush=True)
@@ -219,30 +129,30 @@ class GoogleSearchCollector:
             print("- no results")
             return 0
 
-        org_mentions = 0
         michigan_mentions = 0
+        batch = []
 
         for article in articles:
-            url = article.get("url", "")
-
-            # Skip if already exists
-            normalized_url = url.rstrip('/').replace('http://', 'https://')
-            if url in global_urls or normalized_url in global_urls:
-                self.stats["duplicates_skipped"] += 1
-                continue
-
             # Try to match to Michigan outlet
-            outlet_id = self.get_outlet_id_for_url(url)
+            outlet_id = self.get_outlet_id_for_url(article.get("url", ""))
             if outlet_id:
                 michigan_mentions += 1
 
-            # Save to database
-            if self.save_mention_to_db(org["id"], article, outlet_id):
-                self.stats["mentions_inserted"] += 1
-                org_mentions += 1
-                global_urls.add(url)
-                global_urls.add(normalized_url)
+            batch.append(self.build_mention_row(org["id"], article, outlet_id))
+
+        # One POST per org; duplicates are dropped server-side by the unique
+        # constraint on article_url (ON CONFLICT DO NOTHING)
+        org_mentions = 0
+        try:
+            inserted = self.db.insert_many("media_mentions", batch, on_conflict="article_url")
+            org_mentions = len(inserted)
+            self.stats["duplicates_skipped"] += len(batch) - org_mentions
+        except Exception as e:
+            if self.verbose:
+                print(f"      DB error: {e}")
+            self.stats["errors"] += 1
 
+        self.stats["mentions_inserted"] += org_mentions
         print(f"- {len(articles)} found, {org_mentions} new ({michigan_mentions} MI)")
         self.stats["mentions_found"] += org_mentions
         return org_mentions
@@ -258,11 +168,6 @@ class GoogleSearchCollector:
         # Load outlets
         self.load_outlets()
 
-        # Load existing URLs
-        print("\nLoading existing URLs for deduplication...")
-        global_urls = self.get_all_existing_urls()
-        print(f"Found {len(global_urls)} existing URLs")
-
         # Get organizations
         print("\nFetching organizations...")
         orgs = self.get_organizations(limit=limit, offset=offset, prioritize_ein=prioritize_ein)
@@ -280,7 +185,7 @@ class GoogleSearchCollector:
 
         for i, org in enumerate(orgs, 1):
             print(f"\n[{i}/{len(orgs)}]", end=" ")
-            self.collect_for_org(org, global_urls)
+            self.collect_for_org(org)
             self.stats["orgs_processed"] += 1
 
             # Small delay to be nice
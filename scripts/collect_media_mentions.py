@@ -11,24 +11,43 @@ Improvements:
 - Verbose mode for debugging
 """
 
-import json
-import time
+import csv
+import orjson
 import re
+import sys
+import time
+import asyncio
 import argparse
-import requests
-from datetime import datetime
+import multiprocessing
+from aiolimiter import AsyncLimiter
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential
 from typing import List, Dict, Optional
 import anthropic
 import os
+from dataclasses import dataclass
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from pybloom_live import ScalableBloomFilter
 from dotenv import load_dotenv
 
+from _media_common import SupabaseClient
+
 # Load environment variables from .env file
 load_dotenv()
 
+@dataclass(frozen=True, slots=True)
+class Outlet:
+    """One outlet to search; frozen and slotted since outlets never change
+    after startup and their fields are read in every hot loop."""
+    name: str
+    domain: str
+    outlet_type: str
+    url: str = ""
+
+
 # Michigan media outlets to search (specific outlets)
 # NOTE: 'url' must match the exact value in Supabase outlets table
 # 'domain' is used for filtering search results
-MICHIGAN_OUTLETS = [
+MICHIGAN_OUTLETS = [Outlet(**d) for d in [
     {"name": "Bridge Michigan", "url": "https://www.bridgemi.com", "domain": "bridgemi.com", "outlet_type": "Nonprofit News"},
     {"name": "Detroit Free Press", "url": "https://www.freep.com", "domain": "freep.com", "outlet_type": "Daily Newspaper"},
     {"name": "The Detroit News", "url": "https://www.detroitnews.com", "domain": "detroitnews.com", "outlet_type": "Daily Newspaper"},
@@ -41,77 +60,139 @@ MICHIGAN_OUTLETS = [
     {"name": "WDET", "url": "wdet.org", "domain": "wdet.org", "outlet_type": "Public Radio"},
     {"name": "Interlochen Public Radio", "url": "interlochenpublicradio.org", "domain": "interlochenpublicradio.org", "outlet_type": "Public Radio"},
     {"name": "Great Lakes Now", "url": "greatlakesnow.org", "domain": "greatlakesnow.org", "outlet_type": "Environmental News"},
-]
+]]
 
 # Google News as a catch-all source
-GOOGLE_NEWS = {"name": "Google News", "domain": "news.google.com", "outlet_type": "Aggregator"}
-
-
-class SupabaseClient:
-    """Simple Supabase REST client."""
-
-    def __init__(self):
-        self.url = os.getenv("VITE_SUPABASE_URL")
-        self.key = os.getenv("VITE_SUPABASE_ANON_KEY")
-        if not self.url or not self.key:
-            raise ValueError("Supabase credentials not found in .env file")
-        self.headers = {
-            "apikey": self.key,
-            "Authorization": f"Bearer {self.key}",
-            "Content-Type": "application/json",
-            "Prefer": "return=representation"
-        }
+GOOGLE_NEWS = Outlet(name="Google News", domain="news.google.com", outlet_type="Aggregator")
 
-    def select(self, table: str, columns: str = "*", filters: Dict = None, limit: int = None, offset: int = None, order: str = None) -> List[Dict]:
-        """Select from a table."""
-        url = f"{self.url}/rest/v1/{table}?select={columns}"
-        if order:
-            url += f"&order={order}"
-        if limit:
-            url += f"&limit={limit}"
-        if offset:
-            url += f"&offset={offset}"
-        if filters:
-            for key, value in filters.items():
-                url += f"&{key}=eq.{value}"
-
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
-
-    def select_not_null(self, table: str, columns: str, field: str, limit: int = None, offset: int = None, order: str = None) -> List[Dict]:
-        """Select from a table where a field is not null."""
-        url = f"{self.url}/rest/v1/{table}?select={columns}&{field}=not.is.null"
-        if order:
-            url += f"&order={order}"
-        if limit:
-            url += f"&limit={limit}"
-        if offset:
-            url += f"&offset={offset}"
-
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
-
-    def insert(self, table: str, data: Dict) -> Optional[Dict]:
-        """Insert into a table."""
-        url = f"{self.url}/rest/v1/{table}"
-        response = requests.post(url, headers=self.headers, json=data)
-        if response.status_code in (200, 201):
-            result = response.json()
-            return result[0] if result else None
-        elif response.status_code == 409:
-            # Duplicate
-            return None
-        else:
-            response.raise_for_status()
-            return None
+
+# Static prompt scaffolding shared by every org x outlet call. It is sent as
+# its own content block marked for prompt caching, so only the short dynamic
+# block after it is billed at the full input rate on repeat calls.
+SEARCH_INSTRUCTIONS = """You are finding news coverage of Michigan environmental nonprofit organizations.
+
+Search for up to 5 recent articles (from 2023-2026) that specifically mention the organization named in the search request below. For each article found, extract:
+1. Article headline/title
+2. Article URL
+3. Publication date (if available)
+4. Brief excerpt mentioning the organization (1-2 sentences max)
+
+Return ONLY a JSON array with this structure:
+[
+  {
+    "headline": "Article title",
+    "url": "https://...",
+    "published_date": "YYYY-MM-DD or null",
+    "excerpt": "Brief excerpt..."
+  }
+]
+
+Rules:
+- If no articles are found, return an empty array: []
+- Only include articles that specifically mention the organization by name.
+- published_date must be in YYYY-MM-DD format, or null when the date is unknown.
+- Keep excerpts to 1-2 sentences.
+- Do not wrap the JSON array in markdown fences or add commentary around it."""
+
+# The cached-prefix content block, built once so every call sends the exact
+# same object (byte-identical text is what makes prompt caching hit)
+_INSTRUCTIONS_BLOCK = {"type": "text", "text": SEARCH_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}}
+
+# Columns for the optional CSV export, matching the media_mentions rows
+CSV_FIELDNAMES = ["organization_id", "outlet_id", "article_url", "headline",
+                  "published_date", "excerpt", "mention_type"]
+
+# Compiled once; lazy match avoids pathological backtracking on long responses
+_JSON_ARRAY_RE = re.compile(r'\[[\s\S]*?\]')
+
+# Tracking params that make otherwise-identical URLs look distinct
+_TRACKING_PARAMS = ("fbclid", "gclid")
+
+
+def _canon(u: str) -> str:
+    """Canonicalize a URL for deduplication.
+
+    Lowercases scheme/host, strips www., drops the fragment and tracking
+    query params (utm_*, fbclid, gclid), and trims the trailing slash, so
+    each article contributes one dedup key instead of several variants.
+    """
+    parts = urlsplit(u)
+    netloc = parts.netloc.lower().removeprefix("www.")
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query)
+                       if not k.startswith("utm_") and k not in _TRACKING_PARAMS])
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path.rstrip("/"), query, ""))
+
+
+def _is_rate_limit(exc: BaseException) -> bool:
+    """Treat 429s and explicit rate-limit errors as retryable."""
+    s = str(exc)
+    return "429" in s or "rate_limit" in s.lower()
+
+
+class TokenBucket:
+    """Async tokens-per-minute budget with post-call reconciliation.
+
+    acquire() blocks until the estimated spend fits the rolling budget;
+    reconcile() settles the difference once real usage is known, so the
+    budget tracks actual spend rather than the estimate. penalize() halves
+    the refill rate for a minute after a rate limit.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.rate = tokens_per_minute / 60.0
+        self.capacity = float(tokens_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._last = time.monotonic()
+        self._penalty_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        rate = self.rate / 2 if now < self._penalty_until else self.rate
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * rate)
+        self._last = now
+
+    async def acquire(self, tokens: int) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def reconcile(self, estimated: int, actual: int) -> None:
+        """Credit back (or charge) the gap between estimate and real usage."""
+        self._tokens = min(self.capacity, self._tokens + (estimated - actual))
+
+    def penalize(self) -> None:
+        """Halve the refill rate for the next minute after a 429."""
+        self._penalty_until = time.monotonic() + 60.0
 
 
 class MediaMentionsCollector:
     """Collects media mentions using Claude with web search and stores in Supabase."""
 
-    def __init__(self, verbose: bool = False, include_google: bool = True):
+    # Outlet searches for one org run concurrently, and several orgs are in
+    # flight at once; the semaphore bounds in-flight requests while the
+    # RPM limiter and TPM budget proactively pace just under the account
+    # ceilings instead of burning time on reactive retry backoff
+    MAX_CONCURRENT = 5
+    REQUESTS_PER_MINUTE = 50
+    TOKENS_PER_MINUTE = 40000
+    # Rough per-call spend used to reserve TPM budget up front; reconciled
+    # against response.usage afterwards
+    EST_TOKENS_PER_CALL = 2000
+    ORG_CONCURRENCY = 3
+
+    # Rows are buffered and inserted in bulk; flush before the buffer grows
+    # past this many rows
+    FLUSH_THRESHOLD = 100
+
+    # Page size for the existing-URL scan
+    PAGE_SIZE = 1000
+
+    def __init__(self, verbose: bool = False, include_google: bool = True, csv_path: Optional[str] = None):
         self.verbose = verbose
         self.include_google = include_google
 
@@ -119,7 +200,12 @@ class MediaMentionsCollector:
         api_key = os.getenv("ANTHROPIC_API_KEY")
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in .env file")
-        self.client = anthropic.Anthropic(api_key=api_key)
+        # Bounded timeout and client-side retries so one hung call can't
+        # stall the pipeline
+        self.client = anthropic.AsyncAnthropic(api_key=api_key, timeout=30.0, max_retries=3)
+        self.sem = asyncio.Semaphore(self.MAX_CONCURRENT)
+        self.limiter = AsyncLimiter(self.REQUESTS_PER_MINUTE, 60)
+        self.tpm = TokenBucket(self.TOKENS_PER_MINUTE)
 
         # Initialize Supabase client
         self.db = SupabaseClient()
@@ -127,11 +213,36 @@ class MediaMentionsCollector:
         # Cache for outlet IDs
         self.outlet_ids: Dict[str, int] = {}
 
+        # Mention rows waiting for the next bulk insert
+        self._pending: List[Dict] = []
+
+        # Optional CSV export: rows stream out as they are collected instead
+        # of accumulating in memory; the large buffer batches the disk writes
+        self._csv_fp = None
+        self._csv_writer = None
+        if csv_path:
+            self._csv_fp = open(csv_path, "w", newline="", buffering=1 << 20, encoding="utf-8")
+            self._csv_writer = csv.DictWriter(self._csv_fp, fieldnames=CSV_FIELDNAMES)
+            self._csv_writer.writeheader()
+
         # Build outlet list
         self.outlets = MICHIGAN_OUTLETS.copy()
         if include_google:
             self.outlets.append(GOOGLE_NEWS)
 
+        # Per-outlet request templates rendered once; only {org_name} is
+        # filled in per call, so everything else stays byte-identical
+        self._outlet_requests: Dict[str, str] = {}
+        for outlet in self.outlets:
+            if outlet.domain == "news.google.com":
+                self._outlet_requests[outlet.domain] = (
+                    'Search Google News for recent news articles about "{org_name}" Michigan nonprofit. '
+                    'Use the actual news source URL for each article, not the Google News URL.')
+            else:
+                self._outlet_requests[outlet.domain] = (
+                    f'Search for news articles about "{{org_name}}" on {outlet.name} ({outlet.domain}). '
+                    f'Article URLs must be from {outlet.domain}; do not include articles from other websites.')
+
         # Statistics
         self.stats = {
             "orgs_processed": 0,
@@ -145,27 +256,32 @@ class MediaMentionsCollector:
         """Ensure all outlets exist in database and cache their IDs."""
         print("Checking outlets table...")
 
-        for outlet in self.outlets:
-            # Check if outlet exists (use 'url' field to match Supabase)
-            try:
-                result = self.db.select("outlets", "id", {"url": outlet["url"]})
-                if result:
-                    self.outlet_ids[outlet["domain"]] = result[0]["id"]
-                    print(f"  ✓ Found: {outlet['name']} (id={result[0]['id']})")
+        # One IN-filtered SELECT for all outlets, one bulk insert for any
+        # missing ones, instead of a SELECT (plus maybe an INSERT) per outlet
+        outlets = [o for o in self.outlets if o.url]
+        try:
+            existing = self.db.select("outlets", "id,url", {"url": [o.url for o in outlets]})
+            ids_by_url = {row["url"]: row["id"] for row in existing}
+
+            missing = [o for o in outlets if o.url not in ids_by_url]
+            if missing:
+                inserted = self.db.insert_many("outlets", [
+                    {"name": o.name, "url": o.url, "outlet_type": o.outlet_type}
+                    for o in missing
+                ])
+                for row in inserted:
+                    ids_by_url[row["url"]] = row["id"]
+
+            for outlet in outlets:
+                outlet_id = ids_by_url.get(outlet.url)
+                if outlet_id is not None:
+                    self.outlet_ids[outlet.domain] = outlet_id
+                    created = any(o.url == outlet.url for o in missing)
+                    print(f"  {'+' if created else '✓'} {outlet.name} (id={outlet_id})")
                 else:
-                    # Insert new outlet
-                    insert_result = self.db.insert("outlets", {
-                        "name": outlet["name"],
-                        "url": outlet["url"],
-                        "outlet_type": outlet["outlet_type"]
-                    })
-                    if insert_result:
-                        self.outlet_ids[outlet["domain"]] = insert_result["id"]
-                        print(f"  + Created: {outlet['name']} (id={insert_result['id']})")
-                    else:
-                        print(f"  ✗ Failed to create: {outlet['name']}")
-            except Exception as e:
-                print(f"  ✗ Error with {outlet['name']}: {e}")
+                    print(f"  ✗ Failed to create: {outlet.name}")
+        except Exception as e:
+            print(f"  ✗ Error loading outlets: {e}")
 
     def get_organizations(self, limit: Optional[int] = None, offset: int = 0, prioritize_ein: bool = True) -> List[Dict]:
         """Fetch organizations from Supabase, optionally prioritizing those with EINs."""
@@ -175,124 +291,135 @@ class MediaMentionsCollector:
         else:
             return self.db.select("organizations", "id,name,slug", limit=limit, offset=offset, order="name")
 
-    def get_existing_urls(self, org_id: str) -> set:
-        """Get existing article URLs for an organization to avoid duplicates."""
-        try:
-            result = self.db.select("media_mentions", "article_url", {"organization_id": org_id})
-            return {row["article_url"] for row in result} if result else set()
-        except:
-            return set()
+    def get_all_existing_urls(self) -> ScalableBloomFilter:
+        """Load ALL existing article URLs into a bloom filter.
 
-    def get_all_existing_urls(self) -> set:
-        """Get ALL existing article URLs to avoid duplicates across orgs."""
+        Keyset-paginated scan (id > last seen, ordered by id) instead of one
+        giant SELECT: each page costs the same no matter how deep the scan
+        is, unlike offset pagination which re-skips every prior row. A bloom
+        filter instead of a set keeps memory tiny; a ~1% false positive is
+        just a dup the server would drop anyway.
+        """
+        bloom = ScalableBloomFilter(initial_capacity=100000, error_rate=0.001)
+        last_id = 0
         try:
-            result = self.db.select("media_mentions", "article_url")
-            return {row["article_url"] for row in result} if result else set()
-        except:
-            return set()
-
-    def search_org_in_outlet(self, org_name: str, outlet: Dict, max_retries: int = 3) -> List[Dict]:
-        """Search for an organization in a specific outlet using Claude web search."""
-
-        print(f"    Searching {outlet['name']}...", end=" ", flush=True)
+            while True:
+                rows = self.db.select("media_mentions", "id,article_url",
+                                      {"id": f"gt.{last_id}"},
+                                      limit=self.PAGE_SIZE, order="id.asc")
+                for row in rows:
+                    bloom.add(_canon(row["article_url"]))
+                if len(rows) < self.PAGE_SIZE:
+                    break
+                last_id = rows[-1]["id"]
+        except Exception as e:
+            print(f"  Error loading existing URLs: {e}")
+        return bloom
 
-        # Special handling for Google News - broader search
-        if outlet["domain"] == "news.google.com":
-            search_prompt = f"""Search Google News for recent news articles about "{org_name}" Michigan nonprofit.
+    def build_search_prompt(self, org_name: str, outlet: Outlet) -> List[Dict]:
+        """Build the content blocks for one org/outlet search.
 
-Find up to 5 recent articles (from 2023-2026) that specifically mention this organization. For each article found, extract:
-1. Article headline/title
-2. Article URL (the actual news source URL, not the Google News URL)
-3. Publication date (if available)
-4. Brief excerpt mentioning the organization (1-2 sentences max)
+        The static instructions go in a cached block; the per-outlet request
+        is pre-rendered at init, so only the org name is filled in here
+        (str.replace beats format for a single placeholder).
+        """
+        request = self._outlet_requests[outlet.domain].replace("{org_name}", org_name)
+        return [_INSTRUCTIONS_BLOCK, {"type": "text", "text": request}]
+
+    def extract_articles(self, result_text: str, outlet: Outlet, log: List[str]) -> List[Dict]:
+        """Pull the JSON article array out of a Claude response."""
+        # Well-formed responses parse straight off a find/rfind slice with no
+        # regex at all; the compiled regex is only a fallback
+        articles = None
+        start = result_text.find('[')
+        end = result_text.rfind(']')
+        if start != -1 and end > start:
+            try:
+                articles = orjson.loads(result_text[start:end + 1])
+            except orjson.JSONDecodeError:
+                pass
+        if articles is None:
+            json_match = _JSON_ARRAY_RE.search(result_text)
+            if not json_match:
+                log.append(f"    {outlet.name}: no results")
+                return []
+            try:
+                articles = orjson.loads(json_match.group(0))
+            except orjson.JSONDecodeError:
+                log.append(f"    {outlet.name}: bad JSON")
+                self.stats["errors"] += 1
+                return []
+        # Filter to only include URLs from the correct domain (skip for Google News)
+        if outlet.domain == "news.google.com":
+            valid_articles = articles  # Accept all URLs from Google News search
+        else:
+            valid_articles = [a for a in articles if outlet.domain in a.get('url', '')]
+        log.append(f"    {outlet.name}: found {len(valid_articles)}")
+        return valid_articles
 
-Return ONLY a JSON array with this structure:
-[
-  {{
-    "headline": "Article title",
-    "url": "https://...",
-    "published_date": "YYYY-MM-DD or null",
-    "excerpt": "Brief excerpt..."
-  }}
-]
+    async def search_org_in_outlet(self, org_name: str, outlet: Outlet, log: List[str], max_retries: int = 3) -> List[Dict]:
+        """Search for an organization in a specific outlet using Claude web search."""
 
-If no articles found, return empty array: []
-Only include articles that specifically mention "{org_name}" by name."""
-        else:
-            search_prompt = f"""Search for news articles about "{org_name}" on {outlet['name']} ({outlet['domain']}).
+        search_prompt = self.build_search_prompt(org_name, outlet)
 
-Find up to 5 recent articles (from 2023-2026) that mention this organization. For each article found, extract:
-1. Article headline/title
-2. Article URL (must be from {outlet['domain']})
-3. Publication date (if available)
-4. Brief excerpt mentioning the organization (1-2 sentences max)
+        try:
+            # Rate-limit errors retry with exponential backoff; anything else
+            # fails the outlet immediately
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(max_retries),
+                wait=wait_exponential(multiplier=1, max=30),
+                retry=retry_if_exception(_is_rate_limit),
+                reraise=True
+            ):
+                with attempt:
+                    try:
+                        async with self.limiter, self.sem:
+                            await self.tpm.acquire(self.EST_TOKENS_PER_CALL)
+                            # Stream the response so text accumulates as it
+                            # is generated instead of waiting for the full
+                            # completion. 1200 tokens is ample for a
+                            # 5-article JSON array; temperature=0 keeps the
+                            # format stable
+                            chunks: List[str] = []
+                            async with self.client.messages.stream(
+                                model="claude-sonnet-4-5-20250929",
+                                max_tokens=1200,
+                                temperature=0,
+                                tools=[{"type": "web_search_20250305", "name": "web_search"}],
+                                messages=[{
+                                    "role": "user",
+                                    "content": search_prompt
+                                }]
+                            ) as stream:
+                                async for chunk in stream.text_stream:
+                                    chunks.append(chunk)
+                                response = await stream.get_final_message()
+                    except Exception as e:
+                        # A 429 means the proactive pacing undershot; slow
+                        # the token refill before tenacity retries
+                        if _is_rate_limit(e):
+                            self.tpm.penalize()
+                        raise
+        except Exception as e:
+            log.append(f"    {outlet.name}: error: {e}")
+            self.stats["errors"] += 1
+            return []
 
-Return ONLY a JSON array with this structure:
-[
-  {{
-    "headline": "Article title",
-    "url": "https://...",
-    "published_date": "YYYY-MM-DD or null",
-    "excerpt": "Brief excerpt..."
-  }}
-]
+        # Settle the TPM budget against what the call actually cost
+        usage = response.usage
+        self.tpm.reconcile(self.EST_TOKENS_PER_CALL, usage.input_tokens + usage.output_tokens)
 
-If no articles found, return empty array: []
-Do not include articles from other websites."""
+        result_text = "".join(chunks)
 
-        for attempt in range(max_retries):
-            try:
-                response = self.client.messages.create(
-                    model="claude-sonnet-4-5-20250929",
-                    max_tokens=4000,
-                    tools=[{"type": "web_search_20250305", "name": "web_search"}],
-                    messages=[{
-                        "role": "user",
-                        "content": search_prompt
-                    }]
-                )
-
-                result_text = ""
-                for block in response.content:
-                    if block.type == "text":
-                        result_text += block.text
-
-                if self.verbose:
-                    print(f"\n      Raw response: {result_text[:200]}...")
-
-                json_match = re.search(r'\[[\s\S]*?\]', result_text)
-                if json_match:
-                    articles = json.loads(json_match.group(0))
-                    # Filter to only include URLs from the correct domain (skip for Google News)
-                    if outlet["domain"] == "news.google.com":
-                        valid_articles = articles  # Accept all URLs from Google News search
-                    else:
-                        valid_articles = [a for a in articles if outlet['domain'] in a.get('url', '')]
-                    print(f"found {len(valid_articles)}")
-                    return valid_articles
-                else:
-                    print("no results")
-                    return []
-
-            except Exception as e:
-                error_str = str(e)
-                if "429" in error_str or "rate_limit" in error_str.lower():
-                    wait_time = 30 * (attempt + 1)  # 30s, 60s, 90s
-                    print(f"rate limited, waiting {wait_time}s...", end=" ", flush=True)
-                    time.sleep(wait_time)
-                    if attempt == max_retries - 1:
-                        print("giving up")
-                        self.stats["errors"] += 1
-                        return []
-                else:
-                    print(f"error: {e}")
-                    self.stats["errors"] += 1
-                    return []
+        if self.verbose:
+            log.append(f"      Raw response: {result_text[:200]}...")
+            if response.usage.input_tokens > 1500:
+                log.append(f"      Large prompt: {response.usage.input_tokens} input tokens")
 
-        return []
+        return self.extract_articles(result_text, outlet, log)
 
     def save_mention_to_db(self, org_id: str, outlet_domain: str, article: Dict) -> bool:
-        """Save a single mention to Supabase. Returns True if inserted, False if duplicate."""
+        """Queue a mention for the next bulk insert. Returns True if queued."""
 
         outlet_id = self.outlet_ids.get(outlet_domain)
 
@@ -320,71 +447,94 @@ Do not include articles from other websites."""
             if date_str and date_str != "null":
                 published_date = date_str
 
+        row = {
+            "organization_id": org_id,
+            "outlet_id": outlet_id,
+            "article_url": article.get("url", ""),
+            "headline": article.get("headline", ""),
+            "published_date": published_date,
+            "excerpt": article.get("excerpt", ""),
+            "mention_type": "mention"
+        }
+        self._pending.append(row)
+        if self._csv_writer:
+            self._csv_writer.writerow(row)
+        return True
+
+    def flush_pending(self) -> None:
+        """Insert all queued mentions in a single POST.
+
+        Duplicates are dropped server-side by the unique constraint on
+        article_url (ON CONFLICT DO NOTHING).
+        """
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
         try:
-            result = self.db.insert("media_mentions", {
-                "organization_id": org_id,
-                "outlet_id": outlet_id,
-                "article_url": article.get("url", ""),
-                "headline": article.get("headline", ""),
-                "published_date": published_date,
-                "excerpt": article.get("excerpt", ""),
-                "mention_type": "mention"
-            })
-            return result is not None
+            inserted = self.db.insert_many("media_mentions", batch, on_conflict="article_url")
+            self.stats["mentions_inserted"] += len(inserted)
+            self.stats["duplicates_skipped"] += len(batch) - len(inserted)
         except Exception as e:
-            if "duplicate" not in str(e).lower():
-                print(f"      DB error: {e}")
-                self.stats["errors"] += 1
-            return False
+            print(f"      DB error: {e}")
+            self.stats["errors"] += 1
 
-    def collect_for_org(self, org: Dict, global_urls: set) -> int:
+    async def collect_for_org(self, org: Dict, known_urls: ScalableBloomFilter, run_urls: set) -> int:
         """Collect media mentions for one organization across all outlets."""
 
-        print(f"\n  {org['name']}")
+        # Per-org log buffer: one stdout write per org instead of a flushed
+        # print per outlet, which both cuts syscalls and keeps the output of
+        # concurrent orgs from interleaving
+        log: List[str] = [f"\n  {org['name']}"]
         if org.get('ein'):
-            print(f"  EIN: {org['ein']}")
-        print(f"  {'-' * len(org['name'])}")
-
-        # Get existing URLs for this org
-        existing_urls = self.get_existing_urls(org["id"])
-        # Combine with global URLs for deduplication
-        all_known_urls = existing_urls | global_urls
+            log.append(f"  EIN: {org['ein']}")
+        log.append(f"  {'-' * len(org['name'])}")
 
         org_mentions = 0
 
-        for outlet in self.outlets:
-            articles = self.search_org_in_outlet(org["name"], outlet)
-
-            for article in articles:
-                url = article.get("url", "")
+        # Fan out all outlet searches for this org concurrently; the shared
+        # semaphore and limiter keep the request rate in bounds
+        tasks = [self.search_org_in_outlet(org["name"], outlet, log) for outlet in self.outlets]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
 
-                # Normalize URL for comparison (remove trailing slashes, http vs https)
-                normalized_url = url.rstrip('/').replace('http://', 'https://')
+        for outlet, articles in zip(self.outlets, results):
+            if isinstance(articles, Exception):
+                log.append(f"    {outlet.name}: error: {articles}")
+                self.stats["errors"] += 1
+                continue
 
-                # Skip if URL already exists (check normalized version too)
-                if url in all_known_urls or normalized_url in all_known_urls:
+            for article in articles:
+                # One canonical key per URL; run_urls is the exact set of
+                # URLs added this run, the bloom filter covers what was
+                # already in the database
+                canon_url = _canon(article.get("url", ""))
+                if canon_url in run_urls or canon_url in known_urls:
                     self.stats["duplicates_skipped"] += 1
                     if self.verbose:
-                        print(f"      (dup) {article.get('headline', 'No title')[:40]}...")
+                        log.append(f"      (dup) {article.get('headline', 'No title')[:40]}...")
                     continue
 
-                # Save to database
-                if self.save_mention_to_db(org["id"], outlet["domain"], article):
-                    self.stats["mentions_inserted"] += 1
+                # Queue for bulk insert
+                if self.save_mention_to_db(org["id"], outlet.domain, article):
                     org_mentions += 1
-                    all_known_urls.add(url)
-                    all_known_urls.add(normalized_url)
-                    global_urls.add(url)  # Add to global set for cross-org deduplication
-                    print(f"      + {article.get('headline', 'No title')[:55]}...")
+                    run_urls.add(canon_url)
+                    log.append(f"      + {article.get('headline', 'No title')[:55]}...")
+
+        sys.stdout.write("\n".join(log) + "\n")
 
-            # Rate limiting - 5 seconds between outlets to avoid 30k tokens/min limit
-            time.sleep(5)
+        # One POST per org instead of one per mention (blocking HTTP, so off
+        # the loop)
+        await asyncio.to_thread(self.flush_pending)
 
         self.stats["mentions_found"] += org_mentions
         return org_mentions
 
-    def collect_all(self, limit: Optional[int] = None, offset: int = 0, prioritize_ein: bool = True) -> None:
-        """Collect mentions for organizations."""
+    async def collect_all(self, limit: Optional[int] = None, offset: int = 0, prioritize_ein: bool = True,
+                          orgs: Optional[List[Dict]] = None) -> None:
+        """Collect mentions for organizations.
+
+        When ``orgs`` is given (a pre-fetched slice, e.g. from --workers
+        sharding) it is used as-is instead of querying Supabase.
+        """
 
         print("\n" + "=" * 70)
         print("ECOCENSUS MEDIA MENTIONS COLLECTOR")
@@ -397,12 +547,14 @@ Do not include articles from other websites."""
 
         # Load all existing URLs for global deduplication
         print("\nLoading existing URLs for deduplication...")
-        global_urls = self.get_all_existing_urls()
-        print(f"Found {len(global_urls)} existing URLs")
+        known_urls = self.get_all_existing_urls()
+        run_urls: set = set()
+        print(f"Found {len(known_urls)} existing URLs")
 
         # Get organizations
-        print("\nFetching organizations...")
-        orgs = self.get_organizations(limit=limit, offset=offset, prioritize_ein=prioritize_ein)
+        if orgs is None:
+            print("\nFetching organizations...")
+            orgs = self.get_organizations(limit=limit, offset=offset, prioritize_ein=prioritize_ein)
         print(f"Found {len(orgs)} organizations to process")
 
         if not orgs:
@@ -413,19 +565,125 @@ Do not include articles from other websites."""
         print(f"Max API calls: {len(orgs) * len(self.outlets)}")
         print("=" * 70)
 
-        for i, org in enumerate(orgs, 1):
-            print(f"\n[{i}/{len(orgs)}]", end="")
-            mentions = self.collect_for_org(org, global_urls)
-            self.stats["orgs_processed"] += 1
+        # Bounded worker pool: several orgs progress at once while the shared
+        # limiter/semaphore keep the overall request rate in bounds
+        queue: asyncio.Queue = asyncio.Queue()
+        for org in orgs:
+            queue.put_nowait(org)
+        for _ in range(self.ORG_CONCURRENCY):
+            queue.put_nowait(None)
+
+        async def _worker() -> None:
+            while True:
+                org = await queue.get()
+                if org is None:
+                    break
+                await self.collect_for_org(org, known_urls, run_urls)
+                self.stats["orgs_processed"] += 1
+                print(f"\n[{self.stats['orgs_processed']}/{len(orgs)} orgs done]")
+
+        await asyncio.gather(*(_worker() for _ in range(self.ORG_CONCURRENCY)))
+
+        self.print_summary()
+
+    async def collect_all_batch(self, limit: Optional[int] = None, offset: int = 0, prioritize_ein: bool = True) -> None:
+        """Collect mentions via the Message Batches API.
+
+        Every org x outlet pair is an independent prompt, so the whole
+        fan-out can be submitted as one batch: half the per-token cost, no
+        rate-limit pacing, latency bounded by batch completion.
+        """
+
+        print("\n" + "=" * 70)
+        print("ECOCENSUS MEDIA MENTIONS COLLECTOR (batch mode)")
+        print("=" * 70)
+
+        self.ensure_outlets_exist()
+
+        print("\nLoading existing URLs for deduplication...")
+        known_urls = self.get_all_existing_urls()
+        run_urls: set = set()
+        print(f"Found {len(known_urls)} existing URLs")
+
+        print("\nFetching organizations...")
+        orgs = self.get_organizations(limit=limit, offset=offset, prioritize_ein=prioritize_ein)
+        print(f"Found {len(orgs)} organizations to process")
+
+        if not orgs:
+            print("No organizations found!")
+            return
 
-            # Longer pause between organizations
-            if i < len(orgs):
-                time.sleep(3)
+        # custom_id only allows [A-Za-z0-9_-], so reference outlets by index
+        orgs_by_id = {str(org["id"]): org for org in orgs}
+        batch_requests = [
+            {
+                "custom_id": f"{org['id']}__{outlet_idx}",
+                "params": {
+                    "model": "claude-sonnet-4-5-20250929",
+                    "max_tokens": 1200,
+                    "temperature": 0,
+                    "tools": [{"type": "web_search_20250305", "name": "web_search"}],
+                    "messages": [{
+                        "role": "user",
+                        "content": self.build_search_prompt(org["name"], outlet)
+                    }]
+                }
+            }
+            for org in orgs
+            for outlet_idx, outlet in enumerate(self.outlets)
+        ]
+
+        print(f"Submitting batch of {len(batch_requests)} requests...")
+        batch = await self.client.messages.batches.create(requests=batch_requests)
+        print(f"Batch {batch.id} submitted, polling every 30s...")
+
+        while batch.processing_status != "ended":
+            await asyncio.sleep(30)
+            batch = await self.client.messages.batches.retrieve(batch.id)
+            counts = batch.request_counts
+            print(f"  {counts.succeeded} succeeded, {counts.errored} errored, "
+                  f"{counts.processing} processing", flush=True)
+
+        print("\nBatch complete, saving results...")
+        async for entry in await self.client.messages.batches.results(batch.id):
+            org_id, _, outlet_idx = entry.custom_id.rpartition("__")
+            org = orgs_by_id.get(org_id)
+            outlet = self.outlets[int(outlet_idx)]
+            if org is None:
+                continue
+
+            if entry.result.type != "succeeded":
+                print(f"    {org['name']} / {outlet.name}: {entry.result.type}")
+                self.stats["errors"] += 1
+                continue
+
+            result_text = ""
+            for block in entry.result.message.content:
+                if block.type == "text":
+                    result_text += block.text
 
+            log: List[str] = []
+            for article in self.extract_articles(result_text, outlet, log):
+                canon_url = _canon(article.get("url", ""))
+                if canon_url in run_urls or canon_url in known_urls:
+                    self.stats["duplicates_skipped"] += 1
+                    continue
+                if self.save_mention_to_db(org["id"], outlet.domain, article):
+                    self.stats["mentions_found"] += 1
+                    run_urls.add(canon_url)
+                if len(self._pending) >= self.FLUSH_THRESHOLD:
+                    await asyncio.to_thread(self.flush_pending)
+            if log:
+                sys.stdout.write(f"  {org['name']}:\n" + "\n".join(log) + "\n")
+
+        await asyncio.to_thread(self.flush_pending)
+        self.stats["orgs_processed"] = len(orgs)
         self.print_summary()
 
     def print_summary(self) -> None:
         """Print collection summary."""
+        if self._csv_fp:
+            self._csv_fp.flush()
         print("\n" + "=" * 70)
         print("COLLECTION COMPLETE")
         print("=" * 70)
@@ -437,6 +695,12 @@ Do not include articles from other websites."""
         print("=" * 70)
 
 
+def _run_slice(orgs: List[Dict], verbose: bool, include_google: bool, csv_path: Optional[str]) -> None:
+    """Entry point for one --workers process: collect a pre-fetched org slice."""
+    collector = MediaMentionsCollector(verbose=verbose, include_google=include_google, csv_path=csv_path)
+    asyncio.run(collector.collect_all(orgs=orgs))
+
+
 def main():
     """Main execution with CLI arguments."""
 
@@ -456,7 +720,10 @@ Examples:
     parser.add_argument("--offset", type=int, default=0, help="Starting offset (skip first N orgs)")
     parser.add_argument("--test", action="store_true", help="Test mode: process only 3 organizations")
     parser.add_argument("--no-google", action="store_true", help="Skip Google News search (faster)")
+    parser.add_argument("--csv", metavar="PATH", help="Also stream collected mentions to a CSV file")
+    parser.add_argument("--batch", action="store_true", help="Use the Message Batches API (50%% cheaper, async turnaround)")
     parser.add_argument("--all-orgs", action="store_true", help="Include orgs without EINs (default: EIN-only)")
+    parser.add_argument("--workers", type=int, default=1, help="Shard orgs across N processes (default: 1)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output for debugging")
 
     args = parser.parse_args()
@@ -466,8 +733,24 @@ Examples:
     prioritize_ein = not args.all_orgs
 
     try:
-        collector = MediaMentionsCollector(verbose=args.verbose, include_google=include_google)
-        collector.collect_all(limit=limit, offset=args.offset, prioritize_ein=prioritize_ein)
+        collector = MediaMentionsCollector(verbose=args.verbose, include_google=include_google, csv_path=args.csv)
+        if args.batch:
+            asyncio.run(collector.collect_all_batch(limit=limit, offset=args.offset, prioritize_ein=prioritize_ein))
+        elif args.workers > 1:
+            # Shard orgs across processes: each worker owns an interleaved
+            # slice and runs its own event loop, clients, and dedup filter,
+            # so JSON parsing and TLS scale past the single-process GIL
+            orgs = collector.get_organizations(limit=limit, offset=args.offset, prioritize_ein=prioritize_ein)
+            slices = [orgs[i::args.workers] for i in range(args.workers)]
+            jobs = [
+                (s, args.verbose, include_google, f"{args.csv}.part{i}" if args.csv else None)
+                for i, s in enumerate(slices) if s
+            ]
+            print(f"Sharding {len(orgs)} orgs across {len(jobs)} worker processes...")
+            with multiprocessing.get_context("spawn").Pool(len(jobs)) as pool:
+                pool.starmap(_run_slice, jobs)
+        else:
+            asyncio.run(collector.collect_all(limit=limit, offset=args.offset, prioritize_ein=prioritize_ein))
 
     except ValueError as e:
         print(f"ERROR: {e}")